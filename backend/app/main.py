@@ -2,21 +2,28 @@
 import asyncio
 import uvicorn
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, BackgroundTasks, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Dict, Optional, List
-import json
-from datetime import datetime
+from typing import Dict, Optional, List, Literal
+import orjson
+from datetime import datetime, timezone
 from enum import Enum
+from collections import OrderedDict
+from itertools import islice
 import os, time
 import signal
+import select
 import subprocess
 from pathlib import Path
 from contextlib import asynccontextmanager
 
 from .ws_manager import WebSocketManager
-from .mas_bridge_tags_output import launch_mas_interactive, create_ws_input_handler
-from .models.db import create_repository_analysis, get_repository_analysis, update_analysis_status, list_user_analyses, delete_repository_analysis
+from .mas_bridge_tags_output import launch_mas_interactive, create_ws_input_handler, InputBuffer
+from .models.db import create_repository_analysis, get_repository_analysis, update_repository_analysis, list_user_analyses, delete_repository_analysis
+
+# Read once at import (models.db has already loaded .env)
+MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", "3"))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -34,10 +41,16 @@ async def lifespan(app: FastAPI):
     print("\n🛑 Shutting down Shepherd service...")
     
     # Kill all currently running MAS processes
-    if run_manager.process_pids:
-        print(f"   Killing {len(run_manager.process_pids)} active MAS processes...")
-        for run_id, pid in run_manager.process_pids.items():
-            run_manager.kill_process(pid)
+    # Snapshot and clear tracking once up front: runs that finish while we wait then
+    # have nothing to unregister, instead of rewriting the PID file once per process.
+    # The file itself is left alone until the kills are done, for crash recovery.
+    running = list(run_manager.process_pids.items())
+    run_manager.process_pids.clear()
+    if running:
+        print(f"   Killing {len(running)} active MAS processes...")
+        # Kill in parallel threads so shutdown waits for the slowest process, not the sum
+        await asyncio.gather(*(asyncio.to_thread(run_manager.kill_process, pid) for _, pid in running))
+        for run_id, pid in running:
             print(f"   ✓ Killed process {pid} for run {run_id[:8]}")
     
     # Clean up PID file
@@ -46,7 +59,7 @@ async def lifespan(app: FastAPI):
     
     print("👋 Shutdown complete!")
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 ws_manager = WebSocketManager()
 
 origins = [
@@ -65,8 +78,8 @@ app.add_middleware(
 )
 
 
-# Store input queues for each run
-input_queues: Dict[str, asyncio.Queue] = {}
+# Store input buffers for each run
+input_buffers: Dict[str, InputBuffer] = {}
 
 # Pydantic Models
 class JobRequest(BaseModel):
@@ -75,14 +88,14 @@ class JobRequest(BaseModel):
 class RepositoryAnalysisRequest(BaseModel):
     repository_url: str
     project_description: str
-    environment: str  # "local" or "testnet"
+    environment: Literal["local", "testnet"]
     user_id: Optional[str] = None
     reference_files: Optional[List[str]] = None
 
 class RepositoryUpdateRequest(BaseModel):
     repository_url: Optional[str] = None
     project_description: Optional[str] = None
-    environment: Optional[str] = None
+    environment: Optional[Literal["local", "testnet"]] = None
     reference_files: Optional[List[str]] = None
 
 # Enums and Classes for Queue Management
@@ -93,16 +106,25 @@ class RunStatus(str, Enum):
     FAILED = "failed"
     CANCELLED = "cancelled"
 
+def _isoformat(ts: Optional[float]) -> Optional[str]:
+    """Format a time.time() timestamp for API responses"""
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
 class RunManager:
     """Manages concurrent runs and queuing"""
+    MAX_COMPLETED_RUNS = 100  # finished runs kept for status lookups, oldest evicted first
+
     def __init__(self, max_concurrent: int = 3):
         self.max_concurrent = max_concurrent
         self.active_runs: Dict[str, dict] = {}
         self.queued_runs: List[dict] = []
-        self.completed_runs: Dict[str, dict] = {}
+        self.completed_runs: "OrderedDict[str, dict]" = OrderedDict()
         self._lock = asyncio.Lock()
         self.process_pids: Dict[str, int] = {}
         self.pid_file = Path("./backend/logs/active_pids.json")
+        self._saved_pids: Dict[str, int] = {}  # last snapshot written to pid_file
         self.load_orphaned_pids()  # Call cleanup on init
     async def add_run(self, run_id: str, job_data: dict) -> dict:
         """Add a new run, either starting it or queuing it"""
@@ -112,7 +134,7 @@ class RunManager:
                 self.active_runs[run_id] = {
                     "run_id": run_id,
                     "status": RunStatus.RUNNING,
-                    "started_at": datetime.utcnow().isoformat(),
+                    "started_at": time.time(),
                     "job_data": job_data
                 }
                 return {"status": "started", "run_id": run_id}
@@ -122,7 +144,7 @@ class RunManager:
                 queued_run = {
                     "run_id": run_id,
                     "status": RunStatus.QUEUED,
-                    "queued_at": datetime.utcnow().isoformat(),
+                    "queued_at": time.time(),
                     "queue_position": queue_position,
                     "job_data": job_data
                 }
@@ -131,12 +153,13 @@ class RunManager:
     
     async def complete_run(self, run_id: str, success: bool = True):
         """Mark a run as completed and start next queued run if any"""
+        next_run = None
         async with self._lock:
             if run_id in self.active_runs:
                 run_data = self.active_runs.pop(run_id)
                 run_data["status"] = RunStatus.COMPLETED if success else RunStatus.FAILED
-                run_data["completed_at"] = datetime.utcnow().isoformat()
-                self.completed_runs[run_id] = run_data
+                run_data["completed_at"] = time.time()
+                self._record_finished(run_id, run_data)
                 
                 # Start next queued run if any
                 if self.queued_runs:
@@ -151,35 +174,37 @@ class RunManager:
                     self.active_runs[next_run_id] = {
                         "run_id": next_run_id,
                         "status": RunStatus.RUNNING,
-                        "started_at": datetime.utcnow().isoformat(),
+                        "started_at": time.time(),
                         "job_data": next_run["job_data"]
                     }
-                    
-                    # Notify via WebSocket that the run has started
-                    if ws_manager:
-                        await ws_manager.send_log(next_run_id, {
-                            "type": "status_change",
-                            "data": {"status": "started", "message": "Run started from queue"}
-                        })
-                    
-                    # Return the next run to be started
-                    return next_run
-        return None
+        
+        # Notify outside the lock so a slow WebSocket can't stall other run transitions
+        if next_run and ws_manager:
+            await ws_manager.send_log(next_run["run_id"], {
+                "type": "status_change",
+                "data": {"status": "started", "message": "Run started from queue"}
+            })
+        
+        # Return the next run to be started
+        return next_run
+    
+    def _record_finished(self, run_id: str, run_data: dict):
+        """Move a run into completed_runs, evicting the oldest beyond MAX_COMPLETED_RUNS"""
+        self.completed_runs[run_id] = run_data
+        while len(self.completed_runs) > self.MAX_COMPLETED_RUNS:
+            self.completed_runs.popitem(last=False)
     
     async def cancel_run(self, run_id: str) -> bool:
         """Cancel a run (either active or queued)"""
+        cancelled = False
         async with self._lock:
-            if run_id in self.process_pids:
-                pid = self.process_pids[run_id]
-                if self.kill_process(pid):
-                    print(f"Killed process {pid} for run {run_id[:8]}")
-                self.unregister_process(run_id)
             # Check if it's an active run
             if run_id in self.active_runs:
                 run_data = self.active_runs.pop(run_id)
                 run_data["status"] = RunStatus.CANCELLED
-                run_data["cancelled_at"] = datetime.utcnow().isoformat()
-                self.completed_runs[run_id] = run_data
+                run_data["cancelled_at"] = time.time()
+                self._record_finished(run_id, run_data)
+                cancelled = True
                 
                 # Start next queued run if any
                 if self.queued_runs:
@@ -193,107 +218,110 @@ class RunManager:
                         self.active_runs[next_run_id] = {
                             "run_id": next_run_id,
                             "status": RunStatus.RUNNING,
-                            "started_at": datetime.utcnow().isoformat(),
+                            "started_at": time.time(),
                             "job_data": next_run["job_data"]
                         }
                         # Schedule the queued run to start
                         asyncio.create_task(start_queued_run(next_run))
-                return True
             
             # Check if it's a queued run
-            for i, run in enumerate(self.queued_runs):
-                if run["run_id"] == run_id:
-                    self.queued_runs.pop(i)
-                    # Update queue positions
-                    for j, remaining_run in enumerate(self.queued_runs[i:], start=i):
-                        remaining_run["queue_position"] = j + 1
-                    return True
-            
-            return False
+            else:
+                for i, run in enumerate(self.queued_runs):
+                    if run["run_id"] == run_id:
+                        self.queued_runs.pop(i)
+                        # Update queue positions
+                        for j, remaining_run in enumerate(self.queued_runs[i:], start=i):
+                            remaining_run["queue_position"] = j + 1
+                        cancelled = True
+                        break
+        
+        # Kill only after the run is marked cancelled, so its completion task can't
+        # record it as failed first. kill_process can block for its whole timeout,
+        # so run it in a worker thread rather than stalling the event loop
+        pid = self.process_pids.get(run_id)
+        if pid is not None:
+            if await asyncio.to_thread(self.kill_process, pid):
+                print(f"Killed process {pid} for run {run_id[:8]}")
+            self.unregister_process(run_id)
+        
+        return cancelled
     
     async def get_system_status(self) -> dict:
         """Get current system status with detailed run information"""
-        async with self._lock:
-            # Get active runs with details
-            active_runs_info = []
-            for run_id, run_data in self.active_runs.items():
-                active_runs_info.append({
-                    "run_id": run_id,
-                    "status": run_data["status"],
-                    "started_at": run_data["started_at"],
-                    "github_url": run_data["job_data"].get("github_url") if "job_data" in run_data else None
-                })
-            
-            # Get queued runs with details
-            queued_runs_info = []
-            for run in self.queued_runs:
-                queued_runs_info.append({
-                    "run_id": run["run_id"],
-                    "status": run["status"],
-                    "queued_at": run["queued_at"],
-                    "queue_position": run["queue_position"],
-                    "github_url": run["job_data"].get("github_url") if "job_data" in run else None
-                })
-            
-            # Get recently completed runs (optional - last 5)
-            recent_completed = []
-            # Sort completed runs by completed_at timestamp and get last 5
-            sorted_completed = sorted(
-                self.completed_runs.items(),
-                key=lambda x: x[1].get("completed_at", ""),
-                reverse=True
-            )[:5]
-            
-            for run_id, run_data in sorted_completed:
-                recent_completed.append({
-                    "run_id": run_id,
-                    "status": run_data["status"],
-                    "completed_at": run_data.get("completed_at"),
-                    "github_url": run_data["job_data"].get("github_url") if "job_data" in run_data else None
-                })
-            
-            return {
-                "max_concurrent": self.max_concurrent,
-                "active_runs_count": len(self.active_runs),
-                "queued_runs_count": len(self.queued_runs),
-                "available_slots": self.max_concurrent - len(self.active_runs),
-                "system_status": "at_capacity" if len(self.active_runs) >= self.max_concurrent else "available",
-                "active_runs": active_runs_info,
-                "queued_runs": queued_runs_info,
-                "recent_completed": recent_completed
-            }
+        # Read-only and never awaits, so no other coroutine can interleave: no lock needed
+        # Get active runs with details
+        active_runs_info = []
+        for run_id, run_data in self.active_runs.items():
+            active_runs_info.append({
+                "run_id": run_id,
+                "status": run_data["status"],
+                "started_at": _isoformat(run_data["started_at"]),
+                "github_url": run_data["job_data"].get("github_url") if "job_data" in run_data else None
+            })
+        
+        # Get queued runs with details
+        queued_runs_info = []
+        for run in self.queued_runs:
+            queued_runs_info.append({
+                "run_id": run["run_id"],
+                "status": run["status"],
+                "queued_at": _isoformat(run["queued_at"]),
+                "queue_position": run["queue_position"],
+                "github_url": run["job_data"].get("github_url") if "job_data" in run else None
+            })
+        
+        # Get recently completed runs (optional - last 5)
+        recent_completed = []
+        # completed_runs is kept in finish order, so the newest are at the end
+        for run_id, run_data in islice(reversed(self.completed_runs.items()), 5):
+            recent_completed.append({
+                "run_id": run_id,
+                "status": run_data["status"],
+                "completed_at": _isoformat(run_data.get("completed_at")),
+                "github_url": run_data["job_data"].get("github_url") if "job_data" in run_data else None
+            })
+        
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active_runs_count": len(self.active_runs),
+            "queued_runs_count": len(self.queued_runs),
+            "available_slots": self.max_concurrent - len(self.active_runs),
+            "system_status": "at_capacity" if len(self.active_runs) >= self.max_concurrent else "available",
+            "active_runs": active_runs_info,
+            "queued_runs": queued_runs_info,
+            "recent_completed": recent_completed
+        }
     
     async def get_queue_status(self, run_id: str) -> dict:
         """Get status of a specific run"""
-        async with self._lock:
-            # Check active runs
-            if run_id in self.active_runs:
-                return {"run_id": run_id, "status": "running"}
-            
-            # Check queued runs
-            for run in self.queued_runs:
-                if run["run_id"] == run_id:
-                    return {
-                        "run_id": run_id,
-                        "status": "queued",
-                        "queue_position": run["queue_position"]
-                    }
-            
-            # Check completed runs
-            if run_id in self.completed_runs:
+        # Read-only and never awaits, so no other coroutine can interleave: no lock needed
+        # Check active runs
+        if run_id in self.active_runs:
+            return {"run_id": run_id, "status": "running"}
+        
+        # Check queued runs
+        for run in self.queued_runs:
+            if run["run_id"] == run_id:
                 return {
                     "run_id": run_id,
-                    "status": self.completed_runs[run_id]["status"]
+                    "status": "queued",
+                    "queue_position": run["queue_position"]
                 }
-            
-            return {"run_id": run_id, "status": "not_found"}
+        
+        # Check completed runs
+        if run_id in self.completed_runs:
+            return {
+                "run_id": run_id,
+                "status": self.completed_runs[run_id]["status"]
+            }
+        
+        return {"run_id": run_id, "status": "not_found"}
 
     def load_orphaned_pids(self):
         """Load PIDs from previous session and clean them up"""
         if self.pid_file.exists():
             try:
-                with open(self.pid_file, 'r') as f:
-                    orphaned_pids = json.load(f)
+                orphaned_pids = orjson.loads(self.pid_file.read_bytes())
                 
                 print(f"🧹 Found {len(orphaned_pids)} potentially orphaned processes")
                 
@@ -306,16 +334,23 @@ class RunManager:
                 
                 # Clear the file after cleanup
                 self.pid_file.unlink()
+                self._saved_pids = {}
                 
             except Exception as e:
                 print(f"   Could not load orphaned PIDs: {e}")
 
     def save_active_pids(self):
         """Save current PIDs to file for recovery after crash"""
+        if self.process_pids == self._saved_pids:
+            return
         try:
             self.pid_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.pid_file, 'w') as f:
-                json.dump(self.process_pids, f)
+            # Write to a temp file and rename over the old one so a crash mid-write
+            # never leaves a truncated PID file behind
+            tmp_file = self.pid_file.with_suffix(".tmp")
+            tmp_file.write_bytes(orjson.dumps(self.process_pids))
+            os.replace(tmp_file, self.pid_file)
+            self._saved_pids = dict(self.process_pids)
         except Exception as e:
             print(f"Could not save PIDs: {e}")
     
@@ -340,6 +375,37 @@ class RunManager:
         except (OSError, ProcessLookupError):
             return False
 
+    @staticmethod
+    def wait_for_exit(pid: int, timeout: float) -> bool:
+        """Block until a process exits or timeout elapses; True if it exited"""
+        # On Linux a pidfd becomes readable the moment the process exits, so we can
+        # sleep in poll() instead of polling in a loop (poll, unlike select, has no
+        # FD_SETSIZE limit on the fd number)
+        if hasattr(os, "pidfd_open"):
+            try:
+                pidfd = os.pidfd_open(pid)
+            except ProcessLookupError:
+                return True
+            except OSError:
+                pidfd = None  # kernel without pidfd support, fall back to polling
+            if pidfd is not None:
+                try:
+                    poller = select.poll()
+                    poller.register(pidfd, select.POLLIN)
+                    return bool(poller.poll(timeout * 1000))
+                finally:
+                    os.close(pidfd)
+        
+        # Elsewhere, poll quickly at first so a prompt exit returns within milliseconds
+        deadline = time.monotonic() + timeout
+        delay = 0.005
+        while time.monotonic() < deadline:
+            if not RunManager.is_process_running(pid):
+                return True
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+        return False
+
     @staticmethod
     def kill_process(pid: int, timeout: int = 5):
         """Kill a process gracefully, then forcefully if needed"""
@@ -348,10 +414,8 @@ class RunManager:
             os.kill(pid, signal.SIGTERM)
             
             # Wait up to timeout seconds
-            for _ in range(timeout * 10):
-                if not RunManager.is_process_running(pid):
-                    return True
-                time.sleep(0.1)
+            if RunManager.wait_for_exit(pid, timeout):
+                return True
             
             # Force kill if still running (SIGKILL)
             os.kill(pid, signal.SIGKILL)
@@ -361,7 +425,7 @@ class RunManager:
             # Process already dead
             return True
 # Initialize the run manager
-run_manager = RunManager(max_concurrent=3)
+run_manager = RunManager(max_concurrent=MAX_CONCURRENT_RUNS)
 
 # Helper function for starting queued runs
 async def start_queued_run(queued_run: dict):
@@ -369,11 +433,11 @@ async def start_queued_run(queued_run: dict):
     run_id = queued_run["run_id"]
     job_data = queued_run["job_data"]
     
-    # Create input queue for this run
-    input_queues[run_id] = asyncio.Queue()
+    # Create input buffer for this run
+    input_buffers[run_id] = InputBuffer()
     
     # Create the WebSocket-based input handler
-    input_handler = create_ws_input_handler(run_id, input_queues[run_id])
+    input_handler = create_ws_input_handler(run_id, input_buffers[run_id])
     
     # Start the run
     try:
@@ -392,9 +456,9 @@ async def start_queued_run(queued_run: dict):
         # Mark as complete and potentially start next queued run
         next_run = await run_manager.complete_run(run_id, success)
         
-        # Clean up input queue
-        if run_id in input_queues:
-            del input_queues[run_id]
+        # Clean up input buffer
+        if run_id in input_buffers:
+            del input_buffers[run_id]
         
         # If there's another queued run, start it
         if next_run:
@@ -420,9 +484,9 @@ async def cancel_run(run_id: str):
     """Cancel a run (either active or queued)"""
     success = await run_manager.cancel_run(run_id)
     if success:
-        # Also clean up input queue if exists
-        if run_id in input_queues:
-            del input_queues[run_id]
+        # Also clean up input buffer if exists
+        if run_id in input_buffers:
+            del input_buffers[run_id]
         return {"success": True, "message": f"Run {run_id} cancelled"}
     else:
         return {"success": False, "message": "Run not found or already completed"}
@@ -432,12 +496,9 @@ async def cancel_run(run_id: str):
 async def create_repository_analysis_endpoint(request: RepositoryAnalysisRequest):
     """Create a new repository analysis request and store in Supabase"""
     try:
-        # Validate environment
-        if request.environment not in ["local", "testnet"]:
-            raise HTTPException(status_code=400, detail="Environment must be 'local' or 'testnet'")
-        
         # Create the analysis record in Supabase
-        analysis_record = create_repository_analysis(
+        analysis_record = await run_in_threadpool(
+            create_repository_analysis,
             repository_url=request.repository_url,
             project_description=request.project_description,
             environment=request.environment,
@@ -445,7 +506,7 @@ async def create_repository_analysis_endpoint(request: RepositoryAnalysisRequest
             reference_files=request.reference_files
         )
         
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "run_id": analysis_record["run_id"],
             "message": "Repository analysis created successfully",
@@ -459,12 +520,12 @@ async def create_repository_analysis_endpoint(request: RepositoryAnalysisRequest
 async def get_repository_analysis_endpoint(run_id: str):
     """Get a repository analysis by run_id"""
     try:
-        analysis = get_repository_analysis(run_id)
+        analysis = await run_in_threadpool(get_repository_analysis, run_id)
         
         if not analysis:
             raise HTTPException(status_code=404, detail="Repository analysis not found")
         
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "data": analysis
         })
@@ -478,25 +539,24 @@ async def get_repository_analysis_endpoint(run_id: str):
 async def get_my_repositories(user_id: str = "@0xps", limit: int = 50):
     """Get all repository analyses for a user (My Repositories)"""
     try:
-        repositories = list_user_analyses(user_id, limit)
+        repositories = await run_in_threadpool(list_user_analyses, user_id, limit)
         
         # Format the response to match the UI
-        formatted_repos = []
-        for repo in repositories:
-            # Extract repository name from URL for display
-            repo_name = repo["repository_url"].split("/")[-1] if repo["repository_url"] else "Unknown"
-            
-            formatted_repos.append({
+        formatted_repos = [
+            {
                 "run_id": repo["run_id"],
                 "repository_url": repo["repository_url"],
-                "repository_name": repo_name,
+                # Extract repository name from URL for display
+                "repository_name": repo["repository_url"].rpartition("/")[2] if repo["repository_url"] else "Unknown",
                 "environment": repo["environment"],
                 "status": repo["status"],
                 "created_at": repo["created_at"],
                 "updated_at": repo["updated_at"]
-            })
+            }
+            for repo in repositories
+        ]
         
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "data": formatted_repos
         })
@@ -508,12 +568,6 @@ async def get_my_repositories(user_id: str = "@0xps", limit: int = 50):
 async def update_repository_analysis_endpoint(run_id: str, request: RepositoryUpdateRequest):
     """Update a repository analysis"""
     try:
-        # Get existing analysis
-        existing_analysis = get_repository_analysis(run_id)
-        
-        if not existing_analysis:
-            raise HTTPException(status_code=404, detail="Repository analysis not found")
-        
         # Prepare update data
         update_data = {}
         
@@ -522,19 +576,17 @@ async def update_repository_analysis_endpoint(run_id: str, request: RepositoryUp
         if request.project_description is not None:
             update_data["project_description"] = request.project_description
         if request.environment is not None:
-            if request.environment not in ["local", "testnet"]:
-                raise HTTPException(status_code=400, detail="Environment must be 'local' or 'testnet'")
             update_data["environment"] = request.environment
         if request.reference_files is not None:
             update_data["reference_files"] = request.reference_files
         
-        # Update the analysis
-        update_analysis_status(run_id, existing_analysis["status"], update_data)
+        # Update the analysis and get the updated row back in the same request
+        updated_analysis = await run_in_threadpool(update_repository_analysis, run_id, update_data)
         
-        # Get updated analysis
-        updated_analysis = get_repository_analysis(run_id)
+        if not updated_analysis:
+            raise HTTPException(status_code=404, detail="Repository analysis not found")
         
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "message": "Repository analysis updated successfully",
             "data": updated_analysis
@@ -550,18 +602,18 @@ async def delete_repository_analysis_endpoint(run_id: str):
     """Delete a repository analysis"""
     try:
         # Get existing analysis
-        existing_analysis = get_repository_analysis(run_id)
+        existing_analysis = await run_in_threadpool(get_repository_analysis, run_id)
         
         if not existing_analysis:
             raise HTTPException(status_code=404, detail="Repository analysis not found")
         
         # Delete from Supabase
-        success = delete_repository_analysis(run_id)
+        success = await run_in_threadpool(delete_repository_analysis, run_id)
         
         if not success:
             raise HTTPException(status_code=500, detail="Failed to delete repository analysis")
         
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "message": "Repository analysis deleted successfully"
         })
@@ -580,11 +632,11 @@ async def start_run(run_id: str, job: JobRequest, tasks: BackgroundTasks):
     result = await run_manager.add_run(run_id, job.dict())
     
     if result["status"] == "started":
-        # Create input queue for this run
-        input_queues[run_id] = asyncio.Queue()
+        # Create input buffer for this run
+        input_buffers[run_id] = InputBuffer()
         
         # Create the WebSocket-based input handler
-        input_handler = create_ws_input_handler(run_id, input_queues[run_id])
+        input_handler = create_ws_input_handler(run_id, input_buffers[run_id])
         
         # Wrapper to handle completion
         async def run_with_completion():
@@ -607,9 +659,9 @@ async def start_run(run_id: str, job: JobRequest, tasks: BackgroundTasks):
                 # Mark as complete and potentially start next queued run
                 next_run = await run_manager.complete_run(run_id, success)
                 
-                # Clean up input queue
-                if run_id in input_queues:
-                    del input_queues[run_id]
+                # Clean up input buffer
+                if run_id in input_buffers:
+                    del input_buffers[run_id]
                 
                 # If there's a next run to start, do it
                 if next_run:
@@ -618,13 +670,13 @@ async def start_run(run_id: str, job: JobRequest, tasks: BackgroundTasks):
         # Start MAS in background
         tasks.add_task(run_with_completion)
         
-        return JSONResponse({
+        return ORJSONResponse({
             "status": "started",
             "run_id": run_id
         }, status_code=202)
     
     elif result["status"] == "queued":
-        return JSONResponse({
+        return ORJSONResponse({
             "status": "queued",
             "run_id": run_id,
             "queue_position": result["queue_position"],
@@ -637,10 +689,10 @@ async def start_run(run_id: str, job: JobRequest, tasks: BackgroundTasks):
 @app.get("/runs/{run_id}/status")
 async def get_run_status(run_id: str):
     """Check if a run is active and ready for input."""
-    is_active = run_id in input_queues
+    is_active = run_id in input_buffers
     queue_status = await run_manager.get_queue_status(run_id)
     
-    return JSONResponse({
+    return ORJSONResponse({
         "run_id": run_id,
         "active": is_active,
         "ready_for_input": is_active,
@@ -664,37 +716,37 @@ async def run_logs_ws(ws: WebSocket, run_id: str):
             data = await ws.receive_text()
             
             try:
-                message = json.loads(data)
+                message = orjson.loads(data)
                 
                 # Handle input messages from client
                 if message.get("type") == "input":
                     user_input = message.get("data", "")
                     
-                    # Put input in the queue for MAS to consume
-                    if run_id in input_queues:
-                        await input_queues[run_id].put(user_input)
+                    # Put input in the buffer for MAS to consume
+                    if run_id in input_buffers:
+                        input_buffers[run_id].put_nowait(user_input)
                     else:
                         # Send error if run not found
-                        await ws.send_json({
+                        await ws.send_text(orjson.dumps({
                             "type": "error",
                             "data": "Run not found or not ready for input"
-                        })
+                        }).decode())
                 
                 # Handle other message types if needed
                 elif message.get("type") == "ping":
-                    await ws.send_json({"type": "pong"})
+                    await ws.send_text(orjson.dumps({"type": "pong"}).decode())
                     
-            except json.JSONDecodeError:
-                await ws.send_json({
+            except orjson.JSONDecodeError:
+                await ws.send_text(orjson.dumps({
                     "type": "error",
                     "data": "Invalid JSON message"
-                })
+                }).decode())
                 
     except WebSocketDisconnect:
         ws_manager.disconnect(run_id, ws)
-        # Clean up the input queue if no more connections
-        if run_id in input_queues and not ws_manager._conns.get(run_id):
-            del input_queues[run_id]
+        # Clean up the input buffer if no more connections
+        if run_id in input_buffers and not ws_manager._conns.get(run_id):
+            del input_buffers[run_id]
 
 @app.websocket("/echo/{run_id}")
 async def _echo(ws: WebSocket, run_id: str):
@@ -711,9 +763,9 @@ async def _echo(ws: WebSocket, run_id: str):
 
 # Health check endpoint
 @app.get("/health")
-async def health_check():
+def health_check():
     return {"status": "healthy", "service": "shepherd-mvp"}
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop")
\ No newline at end of file
@@ -487,7 +487,7 @@ async def run_logs_ws(ws: WebSocket, run_id: str):
     except WebSocketDisconnect:
         ws_manager.disconnect(run_id, ws)
         # Clean up the input queue if no more connections
-        if run_id in input_queues and not ws_manager._conns[run_id]:
+        if run_id in input_queues and not ws_manager._conns.get(run_id):
             del input_queues[run_id]
 
 @app.get("/runs/{run_id}/status")
@@ -3,6 +3,7 @@ import asyncio
 import os
 import re
 import json
+from collections import deque
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any, List, Callable
@@ -697,7 +698,11 @@ async def launch_mas_interactive(
                     no_output_count = 0
                 except asyncio.TimeoutError:
                     no_output_count += 1
-                    
+                    if no_output_count == 1:
+                        # output went idle: push out a partial line (e.g. an input() prompt)
+                        log_file.flush()
+                        print(end='', flush=True)
+
                     current_time = asyncio.get_event_loop().time()
                     time_since_last = current_time - last_char_time
                     
@@ -884,18 +889,23 @@ async def launch_mas_interactive(
                 
                 
                 # Process character through output buffer
+                # Echo to the log file and console, flushing once per line rather than
+                # once per character (two syscalls per byte on the event loop)
+                end_of_line = char == '\n'
                 if error_state:
                     # In error state, send directly
                     log_file.write(char)
-                    log_file.flush()
-                    print(char, end='', flush=True)
+                    if end_of_line:
+                        log_file.flush()
+                    print(char, end='', flush=end_of_line)
                     all_output.append(char)
                 else:
                     # Normal flow - use output buffer with tag processing
                     await output_buffer.add_char(char)
                     log_file.write(char)
-                    log_file.flush()
-                    print(char, end='', flush=True)
+                    if end_of_line:
+                        log_file.flush()
+                    print(char, end='', flush=end_of_line)
                     all_output.append(char)
                 
                 # Handle newlines for buffer management
@@ -959,14 +969,33 @@ async def launch_mas_interactive(
             "traceback": traceback.format_exc()
         }
 
+class InputBuffer:
+    """
+    Single-producer/single-consumer channel for user input: a deque plus an Event,
+    which skips asyncio.Queue's getter/putter future bookkeeping
+    """
+    def __init__(self):
+        self._items = deque()
+        self._ready = asyncio.Event()
+
+    def put_nowait(self, item: str):
+        self._items.append(item)
+        self._ready.set()
+
+    async def get(self) -> str:
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()
+
 # Helper function for creating WebSocket-based input handler
-def create_ws_input_handler(run_id: str, input_queue: asyncio.Queue):
+def create_ws_input_handler(run_id: str, input_buffer: InputBuffer):
     """
-    Creates an async input handler that waits for input from a WebSocket queue
+    Creates an async input handler that waits for input from a WebSocket buffer
     """
     async def handler(prompt: str, multiline: bool = False, multiline_continuation: bool = False):
-        # Wait for input from the queue
-        user_input = await input_queue.get()
+        # Wait for input from the buffer
+        user_input = await input_buffer.get()
         return user_input
     
     return handler
\ No newline at end of file
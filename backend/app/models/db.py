@@ -99,6 +99,18 @@ def update_analysis_status(
         print(f"Error updating repository analysis status: {e}")
         return False
 
+def update_repository_analysis(run_id: str, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Update fields of a repository analysis and return the updated record
+    
+    Returns None if no analysis matches run_id; Supabase errors propagate to the caller
+    """
+    data = {**update_data, "updated_at": datetime.utcnow().isoformat()}
+    
+    # PostgREST returns the updated rows, so no follow-up select is needed
+    response = supabase.table("repository_analyses").update(data).eq("run_id", run_id).execute()
+    return response.data[0] if response.data else None
+
 def list_user_analyses(user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
     """
     List all repository analyses for a user
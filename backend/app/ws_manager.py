@@ -1,42 +1,168 @@
 # ws_manager.py
-from collections import defaultdict, deque
-from typing import Dict, Set
+import asyncio
+import json
+import logging
+import orjson
+from typing import Dict, Iterator, List, Optional, Union
 from fastapi import WebSocket
+
+log = logging.getLogger(__name__)
+
+
+class MsgRing:
+    """Fixed-capacity FIFO of the newest messages, preallocated; overwrites the oldest when full"""
+    __slots__ = ("_buf", "_head", "_size")
+
+    def __init__(self, capacity: int) -> None:
+        self._buf: List[Optional[str]] = [None] * capacity
+        self._head = 0            # next slot to write
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.snapshot())
+
+    def append(self, item: str) -> None:
+        buf = self._buf
+        buf[self._head] = item
+        self._head = (self._head + 1) % len(buf)
+        if self._size < len(buf):
+            self._size += 1
+
+    def snapshot(self) -> List[str]:
+        """Oldest-first copy of the contents"""
+        if self._size < len(self._buf):
+            return self._buf[:self._size]
+        return self._buf[self._head:] + self._buf[:self._head]
+
+
+class _Client:
+    """
+    One connected WebSocket, its bounded outbound queue and the task draining it.
+    Queue items are single encoded messages, or a list of them sent as one backlog frame
+    """
+    __slots__ = ("ws", "queue", "writer")
+
+    def __init__(self, ws: WebSocket, max_pending: int) -> None:
+        self.ws = ws
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.writer: Optional[asyncio.Task] = None
+
+
 class WebSocketManager:
     """
-    • Keeps {run_id → set(WebSocket)}  
-    • Stores the last N messages so late joiners can catch up
+    • Keeps {run_id → [client]}  (a run rarely has more than a few viewers)
+    • Stores the last N messages (already JSON-encoded) so late joiners can catch up
+    • Each client gets its own writer task, so one slow socket can't hold up the others;
+      a client that falls behind has its pending messages collapsed into one frame
     """
     MAX_BUFFER = 2000         # keep last 2 000 log msgs ≈ a few MB total
+    MAX_PENDING = 256         # queued frames per client before they're collapsed into one
 
     def __init__(self) -> None:
-        self._conns:   Dict[str, Set[WebSocket]] = defaultdict(set)
-        self._buffers: Dict[str, deque]          = defaultdict(lambda: deque(maxlen=self.MAX_BUFFER))
+        self._conns:   Dict[str, List[_Client]] = {}  # runs with no clients are removed
+        self._buffers: Dict[str, MsgRing]       = {}  # created on a run's first message
 
     async def connect(self, run_id: str, ws: WebSocket) -> None:
         await ws.accept()
-        self._conns[run_id].add(ws)
 
         # ① application-level confirmation
-        await ws.send_json({"type": "connection_ack", "run_id": run_id})
+        await ws.send_text(orjson.dumps({"type": "connection_ack", "run_id": run_id}).decode())
 
-        # ② dump any backlog (if the run already started)
-        for msg in self._buffers[run_id]:
-            await ws.send_json(msg)
+        # ② snapshot the backlog and register in the same step (no await between),
+        #    so every message lands exactly once: in the backlog or in the queue
+        buf = self._buffers.get(run_id)
+        backlog = buf.snapshot() if buf is not None else []
+        client = _Client(ws, self.MAX_PENDING)
+        self._conns.setdefault(run_id, []).append(client)
+        client.writer = asyncio.create_task(self._writer(run_id, client, backlog))
 
     def disconnect(self, run_id: str, ws: WebSocket) -> None:
-        self._conns[run_id].discard(ws)
+        for client in self._conns.get(run_id, ()):
+            if client.ws is ws:
+                self._drop(run_id, client)
+                client.writer.cancel()
+                return
 
     async def send_log(self, run_id: str, payload: dict) -> None:
+        # encode once, for the backlog and every live client
+        text = self._encode(payload)
+
         # cache first
-        self._buffers[run_id].append(payload)
+        buf = self._buffers.get(run_id)
+        if buf is None:
+            buf = self._buffers[run_id] = MsgRing(self.MAX_BUFFER)
+        buf.append(text)
 
-        # then fan-out
-        stale = set()
-        for ws in self._conns[run_id]:
+        # then hand it to each client's writer; never wait on a socket here
+        for client in self._conns.get(run_id, ()):
             try:
-                await ws.send_json(payload)
-            except RuntimeError:
-                stale.add(ws)
-        for ws in stale:
-            self.disconnect(run_id, ws)
\ No newline at end of file
+                client.queue.put_nowait(text)
+            except asyncio.QueueFull:
+                self._collapse(run_id, client, text)
+
+        # yield once so writers of healthy clients drain before a burst can fill them
+        await asyncio.sleep(0)
+
+    @staticmethod
+    def _encode(payload: dict) -> str:
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            # orjson rejects ints beyond 64 bits (e.g. uint256 values in tool results)
+            return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+    async def _writer(self, run_id: str, client: _Client, backlog: List[str]) -> None:
+        ws = client.ws
+        try:
+            # ② dump any backlog (if the run already started) as a single frame, then go live
+            if backlog:
+                await ws.send_text(self._backlog_frame(backlog))
+            while True:
+                item = await client.queue.get()
+                if isinstance(item, list):
+                    await ws.send_text(self._backlog_frame(item))
+                else:
+                    await ws.send_text(item)
+        except Exception as e:
+            # socket is gone; stop queueing for it
+            log.debug("send to client on run %s failed: %s", run_id, e)
+            self._drop(run_id, client)
+
+    def _drop(self, run_id: str, client: _Client) -> None:
+        conns = self._conns.get(run_id)
+        if conns is None:
+            return
+        try:
+            conns.remove(client)
+        except ValueError:
+            return
+        if not conns:
+            del self._conns[run_id]
+
+    def _collapse(self, run_id: str, client: _Client, text: str) -> None:
+        """
+        Slow consumer: fold everything it hasn't been sent yet, plus text, into a single
+        backlog frame. Nothing is dropped or resent, the connection stays open, and the
+        queue stays bounded; only a client more than MAX_BUFFER messages behind loses
+        the oldest of them, as a late joiner would
+        """
+        batch: List[str] = []
+        while not client.queue.empty():
+            item: Union[str, List[str]] = client.queue.get_nowait()
+            if isinstance(item, list):
+                batch.extend(item)
+            else:
+                batch.append(item)
+        batch.append(text)
+        if len(batch) > self.MAX_BUFFER:
+            log.warning("client on run %s is %d msgs behind; skipping the oldest", run_id, len(batch))
+            batch = batch[-self.MAX_BUFFER:]
+        client.queue.put_nowait(batch)
+
+    @staticmethod
+    def _backlog_frame(msgs: List[str]) -> str:
+        # entries are already-encoded JSON, so this is just string concatenation
+        return '{"type":"backlog","msgs":[' + ",".join(msgs) + "]}"
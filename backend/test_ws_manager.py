@@ -0,0 +1,94 @@
+"""
+Tests for WebSocketManager broadcast encoding and slow-client handling
+"""
+
+import asyncio
+import json
+
+from app.ws_manager import WebSocketManager
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+    async def close(self, code=1000, reason=""):
+        pass
+
+
+def test_send_log_handles_ints_beyond_64_bits():
+    """uint256-sized values must not break the broadcast (orjson can't encode them)"""
+    async def run():
+        manager = WebSocketManager()
+        ws = FakeWebSocket()
+        await manager.connect("r1", ws)
+        await manager.send_log("r1", {"data": {"v": 2**70}})
+        await asyncio.sleep(0)
+        manager.disconnect("r1", ws)
+        return ws.sent
+
+    sent = asyncio.run(run())
+    assert json.loads(sent[-1]) == {"data": {"v": 2**70}}
+
+
+def test_send_log_backlog_keeps_big_ints():
+    async def run():
+        manager = WebSocketManager()
+        await manager.send_log("r2", {"v": 2**256 - 1})
+        ws = FakeWebSocket()
+        await manager.connect("r2", ws)
+        await asyncio.sleep(0)
+        manager.disconnect("r2", ws)
+        return ws.sent
+
+    sent = asyncio.run(run())
+    assert json.loads(sent[-1]) == {"type": "backlog", "msgs": [{"v": 2**256 - 1}]}
+
+
+class StalledWebSocket(FakeWebSocket):
+    """Blocks every send until released, like a client on a congested link"""
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+        self.closed = False
+
+    async def send_text(self, text):
+        await self.release.wait()
+        self.sent.append(text)
+
+    async def close(self, code=1000, reason=""):
+        self.closed = True
+
+
+def test_slow_client_gets_pending_msgs_collapsed_not_closed():
+    async def run():
+        manager = WebSocketManager()
+        manager.MAX_PENDING = 3
+        ws = StalledWebSocket()
+        ws.release.set()
+        await manager.connect("r3", ws)      # ack goes out before the stall
+        ws.release.clear()
+        for i in range(10):
+            await manager.send_log("r3", {"i": i})
+        still_registered = ws in [c.ws for c in manager._conns["r3"]]
+        ws.release.set()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        manager.disconnect("r3", ws)
+        return ws, still_registered
+
+    ws, still_registered = asyncio.run(run())
+    assert not ws.closed and still_registered
+    received = []
+    for text in ws.sent[1:]:
+        msg = json.loads(text)
+        received.extend(msg["msgs"] if msg.get("type") == "backlog" else [msg])
+    # every message exactly once, in order, and the overflow arrived as one frame
+    assert received == [{"i": i} for i in range(10)]
+    assert any(json.loads(t).get("type") == "backlog" for t in ws.sent[1:])
@@ -288,14 +288,7 @@ function getSingletonWS(url) {
 
         const ws = getSingletonWS(socketUrl);
 
-        const onMessage = async (evt) => {
-        let raw = evt.data;
-        if (raw instanceof Blob) {
-            try { raw = await raw.text(); } catch { return; }
-        }
-        const msg = parseWsPayload(raw);
-        if (!msg) return;
-
+        const handleMsg = (msg) => {
         const t = String(msg.type || "").toLowerCase().replace(/_/g, "-");
         if (t !== "agent" && t !== "executor-tool-call") return;
 
@@ -356,6 +349,21 @@ function getSingletonWS(url) {
         }
         };
 
+        const onMessage = async (evt) => {
+        let raw = evt.data;
+        if (raw instanceof Blob) {
+            try { raw = await raw.text(); } catch { return; }
+        }
+        const msg = parseWsPayload(raw);
+        if (!msg) return;
+        // Backlog replay arrives as one frame: {"type":"backlog","msgs":[...]}
+        if (msg.type === "backlog" && Array.isArray(msg.msgs)) {
+            msg.msgs.forEach(handleMsg);
+            return;
+        }
+        handleMsg(msg);
+        };
+
         const onError = (e) => {
         // eslint-disable-next-line no-console
         console.error("[Diagram] WS error:", e);
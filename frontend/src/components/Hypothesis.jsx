@@ -168,6 +168,17 @@ const makeRunId = () =>
         // 2) Fallback: legacy JSON payloads { type, data }
         let msg;
         try { msg = JSON.parse(raw || "{}"); } catch { msg = null; }
+
+        // Backlog replay arrives as one frame: {"type":"backlog","msgs":[...]}
+        if (msg?.type === "backlog" && Array.isArray(msg.msgs)) {
+            msg.msgs.forEach(processMsg);
+            return;
+        }
+        processMsg(msg);
+    };
+
+    // JSON payloads { type, data }, already parsed
+    const processMsg = (msg) => {
         if (!msg?.type) return;
 
         const t = String(msg.type).toLowerCase();